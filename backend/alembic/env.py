@@ -2,8 +2,7 @@ from logging.config import fileConfig
 import os
 import sys
 
-from sqlalchemy import engine_from_config, pool, MetaData
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import engine_from_config, pool
 from dotenv import load_dotenv
 
 from alembic import context
@@ -17,11 +16,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # this is the Alembic Config object
 config = context.config
 
-# Set the database URL from environment variable
-# Convert asyncpg to psycopg2 for sync migrations
-database_url = os.getenv("DATABASE_URL", "")
-if database_url.startswith("postgresql+asyncpg://"):
-    database_url = database_url.replace("postgresql+asyncpg://", "postgresql://")
+# Set the database URL from environment variable, normalized like the app's
+# but on psycopg2 for sync migrations
+from config import postgres_url
+
+database_url = postgres_url(os.getenv("DATABASE_URL", ""), "psycopg2")
 config.set_main_option("sqlalchemy.url", database_url)
 
 # Interpret the config file for Python logging.
@@ -29,60 +28,8 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # Import models AFTER setting up the URL to get metadata
-# We need to create a separate Base to avoid the async engine issue
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, BigInteger, Enum as SQLEnum
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-import enum
-
-Base = declarative_base()
-
-class FitnessLevel(str, enum.Enum):
-    beginner = "beginner"
-    intermediate = "intermediate"
-    advanced = "advanced"
-
-class User(Base):
-    __tablename__ = "users"
-    id = Column(Integer, primary_key=True, index=True)
-    strava_id = Column(BigInteger, unique=True, index=True, nullable=False)
-    strava_access_token = Column(String(255), nullable=True)
-    strava_refresh_token = Column(String(255), nullable=True)
-    strava_token_expires_at = Column(Integer, nullable=True)
-    email = Column(String(255), nullable=True)
-    name = Column(String(255), nullable=True)
-    profile_picture = Column(String(512), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-class UserProfile(Base):
-    __tablename__ = "user_profiles"
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
-    race_date = Column(DateTime(timezone=True), nullable=False)
-    goal_time_minutes = Column(Integer, nullable=False)
-    fitness_level = Column(SQLEnum(FitnessLevel), nullable=False)
-
-class TrainingPlan(Base):
-    __tablename__ = "training_plans"
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    plan_json = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-class Run(Base):
-    __tablename__ = "runs"
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    strava_activity_id = Column(BigInteger, unique=True, index=True, nullable=False)
-    name = Column(String(255), nullable=True)
-    distance_meters = Column(Integer, nullable=False)
-    moving_time_seconds = Column(Integer, nullable=False)
-    start_date = Column(DateTime(timezone=True), nullable=False)
-    average_pace = Column(String(50), nullable=True)
-    type = Column(String(50), nullable=True)
-
-# Set target metadata for autogenerate support
+from models import Base
+
 target_metadata = Base.metadata
 
 
@@ -0,0 +1,41 @@
+"""Store training plans as JSONB
+
+Revision ID: 42d985171b31
+Revises: 4416f5489ca2
+Create Date: 2026-10-15 10:04:17.552931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42d985171b31'
+down_revision: Union[str, Sequence[str], None] = '4416f5489ca2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Convert training_plans.plan_json from TEXT to JSONB."""
+    op.alter_column(
+        'training_plans', 'plan_json',
+        existing_type=sa.Text(),
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=False,
+        postgresql_using='plan_json::jsonb',
+    )
+
+
+def downgrade() -> None:
+    """Convert training_plans.plan_json back to TEXT."""
+    op.alter_column(
+        'training_plans', 'plan_json',
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        type_=sa.Text(),
+        existing_nullable=False,
+        postgresql_using='plan_json::text',
+    )
@@ -0,0 +1,42 @@
+"""Index user_id for RLS predicates
+
+Revision ID: 4416f5489ca2
+Revises: 835c007277ac
+Create Date: 2026-10-15 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4416f5489ca2'
+down_revision: Union[str, Sequence[str], None] = '835c007277ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# user_profiles.user_id is already covered by its unique constraint
+TABLES = ['training_plans', 'runs']
+
+
+def upgrade() -> None:
+    """Index user_id on per-user tables."""
+    # CONCURRENTLY can't run inside a transaction, but doesn't block writes
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                op.f(f'ix_{table}_user_id'), table, ['user_id'], unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Drop the user_id indexes."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(
+                op.f(f'ix_{table}_user_id'), table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
@@ -0,0 +1,47 @@
+"""Index latest training plan lookup
+
+Revision ID: 57fa557ad0db
+Revises: a689f0e28a35
+Create Date: 2026-10-15 11:58:20.417305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57fa557ad0db'
+down_revision: Union[str, Sequence[str], None] = 'a689f0e28a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace ix_training_plans_user_id with (user_id, created_at DESC)."""
+    # CONCURRENTLY can't run inside a transaction, but doesn't block writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_training_plans_user_id_created_at', 'training_plans',
+            ['user_id', sa.text('created_at DESC')], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Redundant now: user_id leads the new index
+        op.drop_index(
+            op.f('ix_training_plans_user_id'), table_name='training_plans',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the plain user_id index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_training_plans_user_id'), 'training_plans', ['user_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_training_plans_user_id_created_at', table_name='training_plans',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -22,19 +22,22 @@ TABLES = ['users', 'user_profiles', 'training_plans', 'runs']
 
 def upgrade() -> None:
     """Enable RLS on all tables."""
-    for table in TABLES:
-        # Enable RLS
-        op.execute(f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY')
+    # Fail fast instead of queueing behind long-running readers
+    op.execute("SET LOCAL lock_timeout = '5s'")
 
-        # Force RLS for table owners too (important for Supabase)
-        op.execute(f'ALTER TABLE {table} FORCE ROW LEVEL SECURITY')
+    # Enable RLS and force it for table owners too (important for Supabase),
+    # one ALTER per table sent in a single round trip
+    op.execute("; ".join(
+        f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY, FORCE ROW LEVEL SECURITY'
+        for table in TABLES
+    ))
 
 
 def downgrade() -> None:
     """Disable RLS on all tables."""
-    for table in TABLES:
-        # Disable forced RLS
-        op.execute(f'ALTER TABLE {table} NO FORCE ROW LEVEL SECURITY')
+    op.execute("SET LOCAL lock_timeout = '5s'")
 
-        # Disable RLS
-        op.execute(f'ALTER TABLE {table} DISABLE ROW LEVEL SECURITY')
+    op.execute("; ".join(
+        f'ALTER TABLE {table} NO FORCE ROW LEVEL SECURITY, DISABLE ROW LEVEL SECURITY'
+        for table in TABLES
+    ))
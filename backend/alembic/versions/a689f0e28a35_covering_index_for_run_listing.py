@@ -0,0 +1,53 @@
+"""Covering index for run listing
+
+Revision ID: a689f0e28a35
+Revises: 42d985171b31
+Create Date: 2026-10-15 10:41:52.106377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a689f0e28a35'
+down_revision: Union[str, Sequence[str], None] = '42d985171b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every column get_runs reads, so the listing can be an index-only scan
+INCLUDE = [
+    'id', 'strava_activity_id', 'name', 'distance_meters',
+    'moving_time_seconds', 'average_pace', 'type',
+]
+
+
+def upgrade() -> None:
+    """Replace ix_runs_user_id with (user_id, start_date DESC) covering the listing."""
+    # CONCURRENTLY can't run inside a transaction, but doesn't block writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_runs_user_id_start_date', 'runs', ['user_id', sa.text('start_date DESC')],
+            unique=False, postgresql_include=INCLUDE,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Redundant now: user_id leads the new index
+        op.drop_index(
+            op.f('ix_runs_user_id'), table_name='runs',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the plain user_id index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_runs_user_id'), 'runs', ['user_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_runs_user_id_start_date', table_name='runs',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -1,11 +1,15 @@
-from datetime import datetime, timedelta
+import hashlib
+import hmac
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
-from jose import JWTError, jwt
+from cachetools import TTLCache
+from jose import JWTError, jwk, jwt
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from database import get_db
 from models import User
 from config import get_settings
@@ -13,29 +17,113 @@ from config import get_settings
 settings = get_settings()
 security = HTTPBearer(auto_error=False)
 
+_EXPIRATION_SECONDS = settings.jwt_expiration_hours * 3600
+
+# We issue sub as an int user id; jose would otherwise reject non-string subjects
+_DECODE_OPTIONS = {"verify_sub": False}
+
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+class _PrekeyedHMACKey(jwk.HMACKey):
+    """HMAC JWT key that runs the key schedule once and copies it per token."""
+
+    def __init__(self, key, algorithm):
+        super().__init__(key, algorithm)
+        self._mac = hmac.new(self.prepared_key, digestmod=_HMAC_DIGESTS[algorithm])
+
+    def sign(self, msg):
+        mac = self._mac.copy()
+        mac.update(msg)
+        return mac.digest()
+
+    def verify(self, msg, sig):
+        return hmac.compare_digest(self.sign(msg), sig)
+
+
+# Passing a Key object also spares jose from re-parsing the secret on every call
+_jwt_key = _PrekeyedHMACKey(settings.jwt_secret, settings.jwt_algorithm)
+
+# Successfully verified tokens, keyed by SHA-256 of the raw token.
+# Maps to (user_id, exp) so an entry is never honoured past the token's expiry.
+_token_cache: TTLCache = TTLCache(
+    maxsize=10_000, ttl=min(_EXPIRATION_SECONDS, 30)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Identity of the authenticated user.
+
+    Holds only fields that never change once the user exists, so a cached copy
+    is safe on every instance. Strava tokens and profile state are read from
+    the database where they are used.
+    """
+
+    id: int
+    strava_id: int
+    created_at: datetime
+
+
+# CurrentUser snapshots, keyed by user id
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a cached user so the next request reloads it from the database.
+
+    CurrentUser holds only columns that never change, so nothing calls this
+    today. It is only needed if a mutable column is ever added to CurrentUser.
+    """
+    _user_cache.pop(user_id, None)
+
 
 def create_access_token(user_id: int) -> str:
     """Create JWT access token for user."""
-    expire = datetime.utcnow() + timedelta(hours=settings.jwt_expiration_hours)
-    to_encode = {"sub": str(user_id), "exp": expire}
-    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    # exp is a NumericDate, so integer seconds go straight into the payload
+    to_encode = {"sub": user_id, "exp": int(time.time()) + _EXPIRATION_SECONDS}
+    return jwt.encode(to_encode, _jwt_key, algorithm=settings.jwt_algorithm)
 
 
 def verify_token(token: str) -> Optional[int]:
     """Verify JWT token and return user_id if valid."""
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        user_id, expires_at = cached
+        if expires_at > time.time():
+            return user_id
+        _token_cache.pop(key, None)
+
     try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id = int(payload.get("sub"))
-        return user_id
-    except (JWTError, ValueError):
+        payload = jwt.decode(
+            token,
+            _jwt_key,
+            algorithms=[settings.jwt_algorithm],
+            options=_DECODE_OPTIONS,
+        )
+    except JWTError:
+        return None
+
+    user_id = payload.get("sub")
+    if isinstance(user_id, str) and user_id.isascii() and user_id.isdigit():
+        # Tokens issued before sub became an int claim
+        user_id = int(user_id)
+    if type(user_id) is not int:  # bool is an int subclass; reject true/false
         return None
 
+    # Failed verifications are never cached
+    expires_at = payload.get("exp")
+    if expires_at is not None and expires_at > time.time():
+        _token_cache[key] = (user_id, expires_at)
+    return user_id
+
 
 async def get_current_user(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> CurrentUser:
     """Get current authenticated user from JWT token."""
     token = None
 
@@ -62,17 +150,22 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
     result = await db.execute(
-        select(User).where(User.id == user_id).options(selectinload(User.profile))
+        select(User.id, User.strava_id, User.created_at).where(User.id == user_id)
     )
-    user = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if user is None:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
+    user = _user_cache[user_id] = CurrentUser(*row)
     return user
 
 
@@ -80,7 +173,7 @@ async def get_optional_user(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> Optional[User]:
+) -> Optional[CurrentUser]:
     """Get current user if authenticated, otherwise return None."""
     try:
         return await get_current_user(request, credentials, db)
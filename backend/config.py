@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -18,6 +20,7 @@ class Settings(BaseSettings):
 
     # OpenAI
     openai_api_key: str = ""
+    openai_max_concurrency: int = Field(8, ge=1)  # Plan generations in flight per process
 
     # Frontend URL
     frontend_url: str = "http://localhost:3000"
@@ -26,6 +29,37 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 
+@dataclass(frozen=True, slots=True)
+class RuntimeSettings:
+    """Validated settings as plain slots, so hot-path reads skip pydantic.
+
+    Field names mirror Settings.
+    """
+
+    database_url: str
+    jwt_secret: str
+    jwt_algorithm: str
+    jwt_expiration_hours: int
+    strava_client_id: str
+    strava_client_secret: str
+    strava_redirect_uri: str
+    openai_api_key: str
+    openai_max_concurrency: int
+    frontend_url: str
+
+
+def postgres_url(url: str, driver: str) -> str:
+    """Point a Postgres URL at the given SQLAlchemy driver.
+
+    Hosted Postgres providers hand out plain postgres:// URLs, which SQLAlchemy
+    no longer accepts; any postgres/postgresql scheme is rewritten.
+    """
+    scheme, sep, rest = url.partition("://")
+    if sep and (scheme == "postgres" or scheme.split("+")[0] == "postgresql"):
+        return f"postgresql+{driver}://{rest}"
+    return url
+
+
 @lru_cache()
-def get_settings() -> Settings:
-    return Settings()
+def get_settings() -> RuntimeSettings:
+    return RuntimeSettings(**Settings().model_dump())
@@ -1,13 +1,23 @@
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from config import get_settings
+from config import get_settings, postgres_url
 
 settings = get_settings()
 
-engine = create_async_engine(settings.database_url, echo=True)
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+database_url = postgres_url(settings.database_url, "asyncpg")
 
-Base = declarative_base()
+engine = create_async_engine(
+    database_url,
+    echo=True,
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=5,
+    pool_recycle=1800,
+    # JSONB columns (training plans) round-trip through orjson, not stdlib json
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+)
+async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_db():
@@ -16,8 +26,3 @@ async def get_db():
             yield session
         finally:
             await session.close()
-
-
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
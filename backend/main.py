@@ -2,21 +2,23 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import init_db
 from routes.auth import router as auth_router
 from routes.profile import router as profile_router
 from routes.runs import router as runs_router
 from routes.training_plan import router as training_plan_router
 from config import get_settings
+from services.strava import close_strava_client
+from services.training_plan import close_openai_client
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database tables on startup."""
-    await init_db()
+    """Release shared clients on shutdown. The schema is managed by Alembic."""
     yield
+    await close_strava_client()
+    await close_openai_client()
 
 
 app = FastAPI(
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, BigInteger, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
-from database import Base
 import enum
 
+# Declared here rather than in database.py so Alembic can import the models
+# without creating the async engine
+Base = declarative_base()
+
 
 class FitnessLevel(str, enum.Enum):
     beginner = "beginner"
@@ -46,13 +50,17 @@ class TrainingPlan(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    plan_json = Column(Text, nullable=False)  # Full LLM-generated plan as JSON
+    plan_json = Column(JSONB, nullable=False)  # Full LLM-generated plan
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="training_plans")
 
 
+# Serves the latest-plan lookup (user_id = ? ORDER BY created_at DESC LIMIT 1)
+Index("ix_training_plans_user_id_created_at", TrainingPlan.user_id, TrainingPlan.created_at.desc())
+
+
 class Run(Base):
     __tablename__ = "runs"
 
@@ -67,3 +75,15 @@ class Run(Base):
     type = Column(String(50), nullable=True)  # e.g., "Run", "TrailRun"
 
     user = relationship("User", back_populates="runs")
+
+
+# Covers the paginated listing in get_runs as an index-only scan
+Index(
+    "ix_runs_user_id_start_date",
+    Run.user_id,
+    Run.start_date.desc(),
+    postgresql_include=[
+        "id", "strava_activity_id", "name", "distance_meters",
+        "moving_time_seconds", "average_pace", "type",
+    ],
+)
@@ -1,13 +1,16 @@
+import orjson
+from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import httpx
+from sqlalchemy import select, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from database import get_db
-from models import User
+from models import User, UserProfile
 from schemas import UserResponse, Token
-from auth import create_access_token, get_current_user
+from auth import CurrentUser, create_access_token, get_current_user
 from config import get_settings
+from services.strava import get_strava_client
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
@@ -16,6 +19,15 @@ STRAVA_AUTH_URL = "https://www.strava.com/oauth/authorize"
 STRAVA_TOKEN_URL = "https://www.strava.com/oauth/token"
 STRAVA_ATHLETE_URL = "https://www.strava.com/api/v3/athlete"
 
+# Every parameter comes from static settings, so the URL is built once
+STRAVA_AUTHORIZE_URL = f"{STRAVA_AUTH_URL}?" + urlencode({
+    "client_id": settings.strava_client_id,
+    "response_type": "code",
+    "redirect_uri": settings.strava_redirect_uri,
+    "scope": "read,activity:read_all,profile:read_all",
+    "approval_prompt": "auto",
+})
+
 
 @router.get("/strava")
 async def strava_login():
@@ -26,15 +38,7 @@ async def strava_login():
             detail="Strava client ID not configured"
         )
 
-    params = {
-        "client_id": settings.strava_client_id,
-        "response_type": "code",
-        "redirect_uri": settings.strava_redirect_uri,
-        "scope": "read,activity:read_all,profile:read_all",
-        "approval_prompt": "auto",
-    }
-    auth_url = f"{STRAVA_AUTH_URL}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-    return RedirectResponse(url=auth_url)
+    return RedirectResponse(url=STRAVA_AUTHORIZE_URL)
 
 
 @router.get("/strava/callback")
@@ -47,24 +51,23 @@ async def strava_callback(code: str, db: AsyncSession = Depends(get_db)):
         )
 
     # Exchange code for access token
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            STRAVA_TOKEN_URL,
-            data={
-                "client_id": settings.strava_client_id,
-                "client_secret": settings.strava_client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-            },
-        )
+    token_response = await get_strava_client().post(
+        STRAVA_TOKEN_URL,
+        data={
+            "client_id": settings.strava_client_id,
+            "client_secret": settings.strava_client_secret,
+            "code": code,
+            "grant_type": "authorization_code",
+        },
+    )
 
-        if token_response.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to exchange code for token"
-            )
+    if token_response.status_code != 200:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to exchange code for token"
+        )
 
-        token_data = token_response.json()
+    token_data = orjson.loads(token_response.content)
 
     strava_id = token_data["athlete"]["id"]
     access_token = token_data["access_token"]
@@ -72,35 +75,27 @@ async def strava_callback(code: str, db: AsyncSession = Depends(get_db)):
     expires_at = token_data["expires_at"]
     athlete = token_data["athlete"]
 
-    # Check if user exists
-    result = await db.execute(select(User).where(User.strava_id == strava_id))
-    user = result.scalar_one_or_none()
-
-    if user:
-        # Update existing user's tokens
-        user.strava_access_token = access_token
-        user.strava_refresh_token = refresh_token
-        user.strava_token_expires_at = expires_at
-        user.name = f"{athlete.get('firstname', '')} {athlete.get('lastname', '')}".strip()
-        user.profile_picture = athlete.get("profile")
-    else:
-        # Create new user
-        user = User(
-            strava_id=strava_id,
-            strava_access_token=access_token,
-            strava_refresh_token=refresh_token,
-            strava_token_expires_at=expires_at,
-            email=None,  # Strava doesn't provide email in basic scope
-            name=f"{athlete.get('firstname', '')} {athlete.get('lastname', '')}".strip(),
-            profile_picture=athlete.get("profile"),
-        )
-        db.add(user)
+    # Create the user or update their tokens in one statement. Only the id is
+    # needed afterwards, so RETURNING replaces the lookup and the refresh.
+    values = {
+        "strava_access_token": access_token,
+        "strava_refresh_token": refresh_token,
+        "strava_token_expires_at": expires_at,
+        "name": f"{athlete.get('firstname', '')} {athlete.get('lastname', '')}".strip(),
+        "profile_picture": athlete.get("profile"),
+    }
+    result = await db.execute(
+        pg_insert(User)
+        .values(strava_id=strava_id, **values)
+        .on_conflict_do_update(index_elements=["strava_id"], set_=values)
+        .returning(User.id)
+    )
+    user_id = result.scalar_one()
 
     await db.commit()
-    await db.refresh(user)
 
     # Create JWT token
-    jwt_token = create_access_token(user.id)
+    jwt_token = create_access_token(user_id)
 
     # Redirect to frontend with token in cookie
     response = RedirectResponse(url=f"{settings.frontend_url}/auth/callback")
@@ -116,16 +111,30 @@ async def strava_callback(code: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
     """Get current authenticated user."""
+    # Mutable fields are read fresh, so a profile saved through another
+    # instance shows up immediately
+    result = await db.execute(
+        select(
+            User.email,
+            User.name,
+            User.profile_picture,
+            exists().where(UserProfile.user_id == User.id).label("has_profile"),
+        ).where(User.id == current_user.id)
+    )
+    user = result.one()
     return UserResponse(
         id=current_user.id,
         strava_id=current_user.strava_id,
-        email=current_user.email,
-        name=current_user.name,
-        profile_picture=current_user.profile_picture,
+        email=user.email,
+        name=user.name,
+        profile_picture=user.profile_picture,
         created_at=current_user.created_at,
-        has_profile=current_user.profile is not None,
+        has_profile=user.has_profile,
     )
 
 
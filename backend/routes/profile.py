@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from database import get_db
-from models import User, UserProfile
+from models import UserProfile
 from schemas import ProfileCreate, ProfileResponse
-from auth import get_current_user
+from auth import CurrentUser, get_current_user
 
 router = APIRouter(prefix="/api/profile", tags=["profile"])
 
@@ -12,32 +13,26 @@ router = APIRouter(prefix="/api/profile", tags=["profile"])
 @router.post("", response_model=ProfileResponse)
 async def create_or_update_profile(
     profile_data: ProfileCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Create or update user profile with race details."""
+    values = {
+        "race_date": profile_data.race_date,
+        "goal_time_minutes": profile_data.goal_time_minutes,
+        "fitness_level": profile_data.fitness_level,
+    }
+
+    # Insert or update in one statement; RETURNING replaces the refresh
     result = await db.execute(
-        select(UserProfile).where(UserProfile.user_id == current_user.id)
+        pg_insert(UserProfile)
+        .values(user_id=current_user.id, **values)
+        .on_conflict_do_update(index_elements=["user_id"], set_=values)
+        .returning(UserProfile)
     )
-    profile = result.scalar_one_or_none()
-
-    if profile:
-        # Update existing profile
-        profile.race_date = profile_data.race_date
-        profile.goal_time_minutes = profile_data.goal_time_minutes
-        profile.fitness_level = profile_data.fitness_level
-    else:
-        # Create new profile
-        profile = UserProfile(
-            user_id=current_user.id,
-            race_date=profile_data.race_date,
-            goal_time_minutes=profile_data.goal_time_minutes,
-            fitness_level=profile_data.fitness_level,
-        )
-        db.add(profile)
+    profile = result.scalar_one()
 
     await db.commit()
-    await db.refresh(profile)
 
     return ProfileResponse(
         id=profile.id,
@@ -49,7 +44,7 @@ async def create_or_update_profile(
 
 @router.get("", response_model=ProfileResponse)
 async def get_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get current user's profile."""
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func, literal, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime
+from typing import Optional
 from database import get_db
 from models import User, Run
 from schemas import RunResponse, RunsListResponse, SyncResponse
-from auth import get_current_user
+from auth import CurrentUser, get_current_user
 from services.strava import refresh_strava_token, fetch_strava_activities, calculate_pace
 
 router = APIRouter(prefix="/api/runs", tags=["runs"])
@@ -13,26 +15,41 @@ router = APIRouter(prefix="/api/runs", tags=["runs"])
 
 @router.get("", response_model=RunsListResponse)
 async def get_runs(
-    limit: int = 50,
-    offset: int = 0,
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get user's synced runs."""
+    """Get user's synced runs, newest first.
+
+    Pages are keyset-paginated on (start_date, id): pass the previous page's
+    next_before and next_before_id as before and before_id.
+    """
+    query = select(Run).where(Run.user_id == current_user.id)
+    if before is not None:
+        if before_id is not None:
+            # id breaks ties between runs that share a start_date
+            cursor = tuple_(
+                literal(before, Run.start_date.type), literal(before_id, Run.id.type)
+            )
+            query = query.where(tuple_(Run.start_date, Run.id) < cursor)
+        else:
+            query = query.where(Run.start_date < before)
     result = await db.execute(
-        select(Run)
-        .where(Run.user_id == current_user.id)
-        .order_by(desc(Run.start_date))
-        .limit(limit)
-        .offset(offset)
+        query.order_by(desc(Run.start_date), desc(Run.id)).limit(limit)
     )
     runs = result.scalars().all()
 
-    # Get total count
-    count_result = await db.execute(
-        select(Run).where(Run.user_id == current_user.id)
-    )
-    total = len(count_result.scalars().all())
+    # Only the first page needs the total; later pages are fetched by cursor
+    total = None
+    if before is None:
+        total = len(runs)
+        if total == limit:
+            count_result = await db.execute(
+                select(func.count()).select_from(Run).where(Run.user_id == current_user.id)
+            )
+            total = count_result.scalar_one()
 
     return RunsListResponse(
         runs=[
@@ -49,16 +66,20 @@ async def get_runs(
             for run in runs
         ],
         total=total,
+        next_before=runs[-1].start_date if runs and len(runs) == limit else None,
+        next_before_id=runs[-1].id if runs and len(runs) == limit else None,
     )
 
 
 @router.post("/sync", response_model=SyncResponse)
 async def sync_runs(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Sync runs from Strava."""
-    if not current_user.strava_access_token:
+    # Tokens rotate on refresh, so always read them from the database
+    user = await db.get(User, current_user.id)
+    if not user.strava_access_token:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Strava not connected",
@@ -66,7 +87,7 @@ async def sync_runs(
 
     try:
         # Refresh token if needed
-        access_token = await refresh_strava_token(current_user, db)
+        access_token = await refresh_strava_token(user, db)
 
         # Get the latest run we have to avoid duplicates
         result = await db.execute(
@@ -92,33 +113,34 @@ async def sync_runs(
         run_types = ["Run", "TrailRun", "VirtualRun", "Treadmill"]
         running_activities = [a for a in activities if a.get("type") in run_types]
 
-        synced_count = 0
+        new_runs = []
         for activity in running_activities:
-            # Check if already exists
+            distance = int(activity.get("distance", 0))
+            moving_time = int(activity.get("moving_time", 0))
+
+            new_runs.append({
+                "user_id": current_user.id,
+                "strava_activity_id": activity["id"],
+                "name": activity.get("name"),
+                "distance_meters": distance,
+                "moving_time_seconds": moving_time,
+                "start_date": datetime.fromisoformat(
+                    activity["start_date"].replace("Z", "+00:00")
+                ),
+                "average_pace": calculate_pace(distance, moving_time),
+                "type": activity.get("type"),
+            })
+
+        # Postgres skips activities we already have, so no existence check is
+        # needed and concurrent syncs can't insert the same run twice
+        synced_count = 0
+        if new_runs:
             result = await db.execute(
-                select(Run).where(Run.strava_activity_id == activity["id"])
+                pg_insert(Run)
+                .values(new_runs)
+                .on_conflict_do_nothing(index_elements=["strava_activity_id"])
             )
-            existing = result.scalar_one_or_none()
-
-            if not existing:
-                distance = int(activity.get("distance", 0))
-                moving_time = int(activity.get("moving_time", 0))
-
-                run = Run(
-                    user_id=current_user.id,
-                    strava_activity_id=activity["id"],
-                    name=activity.get("name"),
-                    distance_meters=distance,
-                    moving_time_seconds=moving_time,
-                    start_date=datetime.fromisoformat(
-                        activity["start_date"].replace("Z", "+00:00")
-                    ),
-                    average_pace=calculate_pace(distance, moving_time),
-                    type=activity.get("type"),
-                )
-                db.add(run)
-                synced_count += 1
-
+            synced_count = result.rowcount
         await db.commit()
 
         return SyncResponse(
@@ -1,20 +1,46 @@
-import json
+import orjson
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, insert, desc
 from database import get_db
-from models import User, UserProfile, TrainingPlan
-from schemas import TrainingPlanResponse, TrainingPlanData, GeneratePlanRequest
-from auth import get_current_user
+from models import UserProfile, TrainingPlan
+from schemas import TrainingPlanResponse, GeneratePlanRequest
+from auth import CurrentUser, get_current_user
 from services.training_plan import generate_training_plan
 
 router = APIRouter(prefix="/api/training-plan", tags=["training-plan"])
 
+# Serialized GET responses, keyed by user id. Each entry records the
+# (plan id, updated_at) it was built from, so a newer plan is never masked.
+_plan_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+
+def _plan_body(plan_id: int, plan: dict, created_at, updated_at) -> bytes:
+    """Serialize a plan in the TrainingPlanResponse shape.
+
+    Plans are validated when generated (structured outputs or the fallback
+    template), so they are dumped as-is rather than rebuilt through the
+    pydantic models.
+    """
+    return orjson.dumps({
+        "id": plan_id,
+        "plan": plan,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    })
+
+
+def _stored_plan_body(row) -> bytes:
+    """Serialize a stored plan row in the TrainingPlanResponse shape."""
+    return _plan_body(row.id, row.plan_json, row.created_at, row.updated_at)
+
 
 @router.post("/generate", response_model=TrainingPlanResponse)
 async def generate_plan(
     request: GeneratePlanRequest = GeneratePlanRequest(),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Generate a new training plan using OpenAI."""
@@ -33,21 +59,20 @@ async def generate_plan(
     # Check if plan already exists
     if not request.regenerate:
         existing_result = await db.execute(
-            select(TrainingPlan)
+            select(
+                TrainingPlan.id,
+                TrainingPlan.plan_json,
+                TrainingPlan.created_at,
+                TrainingPlan.updated_at,
+            )
             .where(TrainingPlan.user_id == current_user.id)
             .order_by(desc(TrainingPlan.created_at))
             .limit(1)
         )
-        existing_plan = existing_result.scalar_one_or_none()
+        existing_plan = existing_result.one_or_none()
 
         if existing_plan:
-            plan_data = json.loads(existing_plan.plan_json)
-            return TrainingPlanResponse(
-                id=existing_plan.id,
-                plan=TrainingPlanData(**plan_data),
-                created_at=existing_plan.created_at.isoformat(),
-                updated_at=existing_plan.updated_at.isoformat(),
-            )
+            return Response(content=_stored_plan_body(existing_plan), media_type="application/json")
 
     try:
         # Generate new plan with OpenAI
@@ -55,22 +80,22 @@ async def generate_plan(
             race_date=profile.race_date,
             goal_time_minutes=profile.goal_time_minutes,
             fitness_level=profile.fitness_level,
+            use_cache=not request.regenerate,
         )
 
-        # Save plan to database
-        plan = TrainingPlan(
-            user_id=current_user.id,
-            plan_json=json.dumps(plan_data),
+        # Save plan to database, reading back the server-assigned columns
+        result = await db.execute(
+            insert(TrainingPlan)
+            .values(user_id=current_user.id, plan_json=plan_data)
+            .returning(TrainingPlan.id, TrainingPlan.created_at, TrainingPlan.updated_at)
         )
-        db.add(plan)
+        plan = result.one()
         await db.commit()
-        await db.refresh(plan)
+        _plan_cache.pop(current_user.id, None)
 
-        return TrainingPlanResponse(
-            id=plan.id,
-            plan=TrainingPlanData(**plan_data),
-            created_at=plan.created_at.isoformat(),
-            updated_at=plan.updated_at.isoformat(),
+        return Response(
+            content=_plan_body(plan.id, plan_data, plan.created_at, plan.updated_at),
+            media_type="application/json",
         )
 
     except Exception as e:
@@ -82,28 +107,36 @@ async def generate_plan(
 
 @router.get("", response_model=TrainingPlanResponse)
 async def get_training_plan(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get the current training plan."""
-    result = await db.execute(
-        select(TrainingPlan)
+    latest = (
+        select(TrainingPlan.id, TrainingPlan.updated_at)
         .where(TrainingPlan.user_id == current_user.id)
         .order_by(desc(TrainingPlan.created_at))
         .limit(1)
     )
-    plan = result.scalar_one_or_none()
+    version = (await db.execute(latest)).one_or_none()
 
-    if not plan:
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No training plan found. Please generate one first.",
         )
 
-    plan_data = json.loads(plan.plan_json)
-    return TrainingPlanResponse(
-        id=plan.id,
-        plan=TrainingPlanData(**plan_data),
-        created_at=plan.created_at.isoformat(),
-        updated_at=plan.updated_at.isoformat(),
-    )
+    cached = _plan_cache.get(current_user.id)
+    if cached is None or cached[0] != tuple(version):
+        plan = (
+            await db.execute(
+                select(
+                    TrainingPlan.id,
+                    TrainingPlan.plan_json,
+                    TrainingPlan.created_at,
+                    TrainingPlan.updated_at,
+                ).where(TrainingPlan.id == version.id)
+            )
+        ).one()
+        cached = _plan_cache[current_user.id] = (tuple(version), _stored_plan_body(plan))
+
+    return Response(content=cached[1], media_type="application/json")
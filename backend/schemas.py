@@ -27,8 +27,7 @@ class UserResponse(UserBase):
     created_at: datetime
     has_profile: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Profile schemas
@@ -44,8 +43,7 @@ class ProfileResponse(BaseModel):
     goal_time_minutes: int
     fitness_level: FitnessLevel
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Run schemas
@@ -59,13 +57,15 @@ class RunResponse(BaseModel):
     average_pace: Optional[str]
     type: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RunsListResponse(BaseModel):
     runs: List[RunResponse]
-    total: int
+    total: Optional[int] = None
+    # Cursor for the next page, if any
+    next_before: Optional[datetime] = None
+    next_before_id: Optional[int] = None
 
 
 class SyncResponse(BaseModel):
@@ -104,8 +104,8 @@ class TrainingPlanData(BaseModel):
 class TrainingPlanResponse(BaseModel):
     id: int
     plan: TrainingPlanData
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,6 +1,7 @@
 import httpx
+import orjson
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
 from config import get_settings
@@ -10,6 +11,30 @@ settings = get_settings()
 STRAVA_TOKEN_URL = "https://www.strava.com/oauth/token"
 STRAVA_ACTIVITIES_URL = "https://www.strava.com/api/v3/athlete/activities"
 
+# Shared across requests so connections to strava.com are kept alive.
+# Created on first use and closed in the app lifespan, so a later lifespan in
+# the same process gets a fresh client.
+_strava_client: Optional[httpx.AsyncClient] = None
+
+
+def get_strava_client() -> httpx.AsyncClient:
+    """Return the shared Strava HTTP client, creating it if needed."""
+    global _strava_client
+    if _strava_client is None:
+        _strava_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _strava_client
+
+
+async def close_strava_client() -> None:
+    """Close the shared Strava HTTP client if one was created."""
+    global _strava_client
+    if _strava_client is not None:
+        await _strava_client.aclose()
+        _strava_client = None
+
 
 async def refresh_strava_token(user: User, db: AsyncSession) -> str:
     """Refresh Strava access token if expired."""
@@ -20,21 +45,20 @@ async def refresh_strava_token(user: User, db: AsyncSession) -> str:
         return user.strava_access_token
 
     # Refresh the token
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            STRAVA_TOKEN_URL,
-            data={
-                "client_id": settings.strava_client_id,
-                "client_secret": settings.strava_client_secret,
-                "grant_type": "refresh_token",
-                "refresh_token": user.strava_refresh_token,
-            },
-        )
+    response = await get_strava_client().post(
+        STRAVA_TOKEN_URL,
+        data={
+            "client_id": settings.strava_client_id,
+            "client_secret": settings.strava_client_secret,
+            "grant_type": "refresh_token",
+            "refresh_token": user.strava_refresh_token,
+        },
+    )
 
-        if response.status_code != 200:
-            raise Exception("Failed to refresh Strava token")
+    if response.status_code != 200:
+        raise Exception("Failed to refresh Strava token")
 
-        token_data = response.json()
+    token_data = orjson.loads(response.content)
 
     # Update user tokens
     user.strava_access_token = token_data["access_token"]
@@ -59,17 +83,16 @@ async def fetch_strava_activities(
     if after:
         params["after"] = after
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            STRAVA_ACTIVITIES_URL,
-            headers={"Authorization": f"Bearer {access_token}"},
-            params=params,
-        )
+    response = await get_strava_client().get(
+        STRAVA_ACTIVITIES_URL,
+        headers={"Authorization": f"Bearer {access_token}"},
+        params=params,
+    )
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch activities: {response.text}")
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch activities: {response.text}")
 
-        return response.json()
+    return orjson.loads(response.content)
 
 
 def calculate_pace(distance_meters: int, time_seconds: int) -> str:
@@ -77,9 +100,7 @@ def calculate_pace(distance_meters: int, time_seconds: int) -> str:
     if distance_meters == 0:
         return "N/A"
 
-    # Calculate seconds per km
-    seconds_per_km = (time_seconds / distance_meters) * 1000
-    minutes = int(seconds_per_km // 60)
-    seconds = int(seconds_per_km % 60)
+    # Whole seconds per km, in integer arithmetic
+    minutes, seconds = divmod(time_seconds * 1000 // distance_meters, 60)
 
     return f"{minutes}:{seconds:02d}/km"
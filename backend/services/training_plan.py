@@ -1,13 +1,59 @@
-import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+import asyncio
+import httpx
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
+from cachetools import TTLCache
 from pydantic import BaseModel
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, LengthFinishReasonError
 from models import FitnessLevel
 from config import get_settings
 
 settings = get_settings()
 
+# Shared so plan generations reuse pooled connections to the OpenAI API.
+# Created on first use (the constructor rejects a missing key, which should
+# only fail generation) and closed in the app lifespan.
+_openai_client: Optional[AsyncOpenAI] = None
+
+# Caps concurrent generations so a burst queues here instead of tripping
+# OpenAI rate limits and falling back to the template plan. Created on first use.
+_openai_semaphore: Optional[asyncio.Semaphore] = None
+
+# OpenAI plans keyed by everything the prompt depends on
+# (today, race day, goal time, fitness level), so a hit is the same request
+_generated_plans: TTLCache = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the shared OpenAI client, creating it if needed."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            # Fail fast on connect; a full-length plan can take minutes to decode,
+            # but not the SDK's default ten, which would pin a semaphore slot
+            timeout=httpx.Timeout(300.0, connect=5.0),
+        )
+    return _openai_client
+
+
+def get_openai_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent OpenAI calls, creating it if needed."""
+    global _openai_semaphore
+    if _openai_semaphore is None:
+        _openai_semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+    return _openai_semaphore
+
+
+async def close_openai_client() -> None:
+    """Close the shared OpenAI client if one was created."""
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+
 
 class Workout(BaseModel):
     day: str
@@ -36,6 +82,36 @@ class TrainingPlan(BaseModel):
     notes: str
 
 
+# Constant instructions; the response shape comes from the TrainingPlan schema
+_SYSTEM_PROMPT = """You are an expert marathon running coach. Generate detailed, scientifically-backed training plans.
+
+Rules:
+- Use MILES for every distance (the distance_km fields hold miles) and min/mile paces like "8:30/mi".
+- Give each week seven workouts, Monday to Sunday, with YYYY-MM-DD start_date/end_date.
+- Workout types: easy_run, tempo, long_run, intervals, rest, cross_training.
+- A long run every weekend (Sunday preferred), one quality workout (tempo or intervals) and 1-2 rest days per week.
+- Build mileage by at most 10% per week, then a 3-week taper; the final week is very light with the race on its last day.
+- Set race_name to "Marathon" and put general training advice in notes."""
+
+# Output budget per plan week. Deliberately loose (about twice a rough estimate
+# of the JSON per week): a truncated plan fails to parse and falls back to the
+# template, so running short costs far more than an unused reservation
+_TOKENS_PER_WEEK = 1000
+
+# Fixed part of the output budget: plan-level fields and the closing notes
+_BASE_PLAN_TOKENS = 1000
+
+# Filled in with str.format_map per request
+_PROMPT_TEMPLATE = """Create a {weeks_until_race}-week marathon training plan, week 1 starting today ({today}).
+
+Race date: {race_date}
+Goal time: {goal_time_str} ({goal_time_minutes} minutes)
+Fitness level: {fitness_level}
+Paces: easy {paces[easy]}, long run {paces[long_run]}, tempo {paces[tempo]}, intervals {paces[intervals]}, race {paces[race]}
+Weekly mileage: start ~{mileage[start]} mi, peak ~{mileage[peak]} mi around week {peak_week}, taper ~{mileage[taper]} mi"""
+
+
+@lru_cache(maxsize=4096)
 def format_goal_time(minutes: int) -> str:
     """Convert minutes to HH:MM:SS format."""
     hours = minutes // 60
@@ -43,8 +119,12 @@ def format_goal_time(minutes: int) -> str:
     return f"{hours}:{mins:02d}:00"
 
 
-def get_target_paces(goal_time_minutes: int) -> Dict[str, str]:
-    """Calculate target paces based on goal marathon time."""
+@lru_cache(maxsize=4096)
+def get_target_paces(goal_time_minutes: int) -> Mapping[str, str]:
+    """Calculate target paces based on goal marathon time.
+
+    Results are cached and shared between callers, so they are read-only.
+    """
     # Marathon distance in miles
     marathon_miles = 26.2188
 
@@ -67,19 +147,30 @@ def get_target_paces(goal_time_minutes: int) -> Dict[str, str]:
         secs = int(seconds % 60)
         formatted[pace_type] = f"{mins}:{secs:02d}/mi"
 
-    return formatted
+    return MappingProxyType(formatted)
 
 
 async def generate_training_plan(
     race_date: datetime,
     goal_time_minutes: int,
     fitness_level: FitnessLevel,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
-    """Generate a marathon training plan using OpenAI."""
+    """Generate a marathon training plan using OpenAI.
+
+    Plans for an identical prompt are reused unless use_cache is False.
+    The returned dict may be shared, so treat it as read-only.
+    """
 
     # Calculate weeks until race
     today = datetime.now().date()
     race_day = race_date.date()
+
+    cache_key = (today, race_day, goal_time_minutes, fitness_level)
+    if use_cache:
+        cached = _generated_plans.get(cache_key)
+        if cached is not None:
+            return cached
     days_until_race = (race_day - today).days
     weeks_until_race = max(1, days_until_race // 7)
 
@@ -96,119 +187,133 @@ async def generate_training_plan(
 
     mileage = mileage_guide[fitness_level]
 
-    prompt = f"""Generate a detailed {weeks_until_race}-week marathon training plan in JSON format.
-
-Runner Profile:
-- Race Date: {race_date.strftime('%Y-%m-%d')}
-- Goal Time: {goal_time_str} ({goal_time_minutes} minutes)
-- Fitness Level: {fitness_level.value}
-- Weeks until race: {weeks_until_race}
-
-Target Paces:
-- Easy runs: {paces['easy']}
-- Long runs: {paces['long_run']}
-- Tempo runs: {paces['tempo']}
-- Intervals: {paces['intervals']}
-- Race pace: {paces['race']}
-
-Weekly Mileage Guidelines:
-- Starting: ~{mileage['start']} miles/week
-- Peak (around week {max(1, weeks_until_race - 3)}): ~{mileage['peak']} miles/week
-- Taper (final 2-3 weeks): ~{mileage['taper']} miles/week
-
-IMPORTANT: All distances should be in MILES, and all paces should be in minutes per MILE (e.g., "8:30/mi").
-
-Generate a JSON object with this exact structure:
-{{
-  "race_name": "Marathon",
-  "race_date": "{race_date.strftime('%Y-%m-%d')}",
-  "goal_time": "{goal_time_str}",
-  "total_weeks": {weeks_until_race},
-  "weeks": [
-    {{
-      "week_number": 1,
-      "start_date": "YYYY-MM-DD",
-      "end_date": "YYYY-MM-DD",
-      "theme": "Base Building",
-      "total_distance_km": 22.0,
-      "workouts": [
-        {{
-          "day": "Monday",
-          "workout_type": "rest",
-          "description": "Complete rest or light stretching",
-          "distance_km": null,
-          "pace_target": null,
-          "notes": "Recovery day"
-        }},
-        {{
-          "day": "Tuesday",
-          "workout_type": "easy_run",
-          "description": "Easy aerobic run",
-          "distance_km": 5.0,
-          "pace_target": "{paces['easy']}",
-          "notes": "Keep heart rate in zone 2"
-        }}
-        // ... other days
-      ]
-    }}
-    // ... other weeks
-  ],
-  "notes": "General training notes and advice"
-}}
-
-NOTE: The field is called "distance_km" but use MILES for all values. The field name is kept for compatibility.
-
-Workout types: easy_run, tempo, long_run, intervals, rest, cross_training
-
-Important guidelines:
-1. Include a long run every weekend (Sunday preferred)
-2. Include one quality workout per week (tempo or intervals)
-3. Include 1-2 rest days per week
-4. Gradually build mileage (max 10% increase per week)
-5. Include a 3-week taper before race day
-6. The final week should be very light with the race on the last day
-7. Calculate start_date and end_date for each week starting from today ({today.strftime('%Y-%m-%d')})
-
-Return ONLY valid JSON, no additional text or markdown."""
-
-    client = AsyncOpenAI(api_key=settings.openai_api_key)
+    prompt = _PROMPT_TEMPLATE.format_map({
+        "weeks_until_race": weeks_until_race,
+        "race_date": race_day.isoformat(),
+        "goal_time_str": goal_time_str,
+        "goal_time_minutes": goal_time_minutes,
+        "fitness_level": fitness_level.value,
+        "paces": paces,
+        "mileage": mileage,
+        "peak_week": max(1, weeks_until_race - 3),
+        "today": today.isoformat(),
+    })
 
     try:
-        response = await client.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert marathon running coach. Generate detailed, scientifically-backed training plans.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=16384,
-            response_format=TrainingPlan,
-        )
+        async with get_openai_semaphore():
+            response = await get_openai_client().beta.chat.completions.parse(
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": _SYSTEM_PROMPT,
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.7,
+                max_tokens=min(16384, _BASE_PLAN_TOKENS + weeks_until_race * _TOKENS_PER_WEEK),
+                response_format=TrainingPlan,
+            )
 
         plan = response.choices[0].message.parsed
-        return plan.model_dump()
+        plan_data = _generated_plans[cache_key] = plan.model_dump()
+        return plan_data
+
+    except LengthFinishReasonError as e:
+        print(
+            f"OpenAI plan truncated at max_tokens for a {weeks_until_race}-week plan "
+            f"({e.completion.usage.completion_tokens if e.completion.usage else '?'} tokens); "
+            "raise _TOKENS_PER_WEEK"
+        )
+        return generate_fallback_plan(race_date, goal_time_minutes, weeks_until_race, paces, today)
 
     except Exception as e:
         print(f"OpenAI API error: {str(e)}")
-        return generate_fallback_plan(race_date, goal_time_minutes, weeks_until_race, paces)
+        return generate_fallback_plan(race_date, goal_time_minutes, weeks_until_race, paces, today)
+
+
+# One week of the fallback plan, in miles. Distances, paces and Wednesday's
+# workout type are filled in per week.
+_WEEK_TEMPLATE = (
+    {
+        "day": "Monday",
+        "workout_type": "rest",
+        "description": "Rest day",
+        "distance_km": None,
+        "pace_target": None,
+        "notes": "Recovery",
+    },
+    {
+        "day": "Tuesday",
+        "workout_type": "easy_run",
+        "description": "Easy run",
+        "distance_km": None,
+        "pace_target": None,
+        "notes": None,
+    },
+    {
+        "day": "Wednesday",
+        "workout_type": None,
+        "description": "Quality workout",
+        "distance_km": None,
+        "pace_target": None,
+        "notes": "Key workout of the week",
+    },
+    {
+        "day": "Thursday",
+        "workout_type": "easy_run",
+        "description": "Recovery run",
+        "distance_km": None,
+        "pace_target": None,
+        "notes": None,
+    },
+    {
+        "day": "Friday",
+        "workout_type": "rest",
+        "description": "Rest day",
+        "distance_km": None,
+        "pace_target": None,
+        "notes": None,
+    },
+    {
+        "day": "Saturday",
+        "workout_type": "easy_run",
+        "description": "Easy run",
+        "distance_km": None,
+        "pace_target": None,
+        "notes": None,
+    },
+    {
+        "day": "Sunday",
+        "workout_type": "long_run",
+        "description": "Long run",
+        "distance_km": None,
+        "pace_target": None,
+        "notes": "Build endurance",
+    },
+)
 
 
 def generate_fallback_plan(
     race_date: datetime,
     goal_time_minutes: int,
     weeks: int,
-    paces: Dict[str, str],
+    paces: Mapping[str, str],
+    today: Optional[date] = None,
 ) -> Dict[str, Any]:
     """Generate a basic training plan template as fallback."""
-    today = datetime.now().date()
+    if today is None:
+        today = datetime.now().date()
     goal_time_str = format_goal_time(goal_time_minutes)
+    week_starts = [today + timedelta(weeks=i) for i in range(weeks)]
+    easy_pace = paces["easy"]
+    long_run_pace = paces["long_run"]
+    # Wednesday alternates between these (workout_type, pace_target) pairs
+    tempo = ("tempo", paces["tempo"])
+    intervals = ("intervals", paces["intervals"])
 
     plan_weeks = []
-    for week_num in range(1, weeks + 1):
-        week_start = today + timedelta(weeks=week_num - 1)
+    for week_num, week_start in enumerate(week_starts, 1):
         week_end = week_start + timedelta(days=6)
 
         # Determine week theme (distances in miles)
@@ -221,75 +326,31 @@ def generate_fallback_plan(
         else:
             theme = "Taper"
 
-        # Adjust for progression
+        # Adjust for progression; every distance scales with the same multiplier
         multiplier = min(1.0 + (week_num - 1) * 0.05, 1.5) if week_num <= weeks - 3 else 0.6
+        easy = round(5 * multiplier, 1)
+        quality = round(6 * multiplier, 1)
+        recovery = round(4 * multiplier, 1)
+        long_run = round(12 * multiplier, 1)
+
+        workouts = [dict(workout) for workout in _WEEK_TEMPLATE]
+        _, tuesday, wednesday, thursday, _, saturday, sunday = workouts
+        tuesday["distance_km"], tuesday["pace_target"] = easy, easy_pace
+        wednesday["workout_type"], wednesday["pace_target"] = (
+            tempo if week_num % 2 == 0 else intervals
+        )
+        wednesday["distance_km"] = quality
+        thursday["distance_km"], thursday["pace_target"] = recovery, easy_pace
+        saturday["distance_km"], saturday["pace_target"] = easy, easy_pace
+        sunday["distance_km"], sunday["pace_target"] = long_run, long_run_pace
 
-        # Distances in miles
-        workouts = [
-            {
-                "day": "Monday",
-                "workout_type": "rest",
-                "description": "Rest day",
-                "distance_km": None,
-                "pace_target": None,
-                "notes": "Recovery",
-            },
-            {
-                "day": "Tuesday",
-                "workout_type": "easy_run",
-                "description": "Easy run",
-                "distance_km": round(5 * multiplier, 1),
-                "pace_target": paces["easy"],
-                "notes": None,
-            },
-            {
-                "day": "Wednesday",
-                "workout_type": "tempo" if week_num % 2 == 0 else "intervals",
-                "description": "Quality workout",
-                "distance_km": round(6 * multiplier, 1),
-                "pace_target": paces["tempo"] if week_num % 2 == 0 else paces["intervals"],
-                "notes": "Key workout of the week",
-            },
-            {
-                "day": "Thursday",
-                "workout_type": "easy_run",
-                "description": "Recovery run",
-                "distance_km": round(4 * multiplier, 1),
-                "pace_target": paces["easy"],
-                "notes": None,
-            },
-            {
-                "day": "Friday",
-                "workout_type": "rest",
-                "description": "Rest day",
-                "distance_km": None,
-                "pace_target": None,
-                "notes": None,
-            },
-            {
-                "day": "Saturday",
-                "workout_type": "easy_run",
-                "description": "Easy run",
-                "distance_km": round(5 * multiplier, 1),
-                "pace_target": paces["easy"],
-                "notes": None,
-            },
-            {
-                "day": "Sunday",
-                "workout_type": "long_run",
-                "description": "Long run",
-                "distance_km": round(12 * multiplier, 1),
-                "pace_target": paces["long_run"],
-                "notes": "Build endurance",
-            },
-        ]
-
-        total_km = sum(w["distance_km"] or 0 for w in workouts)
+        # Same addition order as the workout days, so the rounding is unchanged
+        total_km = easy + quality + recovery + easy + long_run
 
         plan_weeks.append({
             "week_number": week_num,
-            "start_date": week_start.strftime("%Y-%m-%d"),
-            "end_date": week_end.strftime("%Y-%m-%d"),
+            "start_date": week_start.isoformat(),
+            "end_date": week_end.isoformat(),
             "theme": theme,
             "total_distance_km": round(total_km, 1),
             "workouts": workouts,
@@ -297,7 +358,7 @@ def generate_fallback_plan(
 
     return {
         "race_name": "Marathon",
-        "race_date": race_date.strftime("%Y-%m-%d"),
+        "race_date": race_date.date().isoformat(),
         "goal_time": goal_time_str,
         "total_weeks": weeks,
         "weeks": plan_weeks,
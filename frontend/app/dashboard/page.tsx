@@ -22,7 +22,7 @@ export default function Dashboard() {
         const [profileData, planData, runsData] = await Promise.all([
           profileApi.get(),
           trainingPlanApi.get().catch(() => null),
-          runsApi.getAll(5, 0),
+          runsApi.getAll(5),
         ]);
 
         setProfile(profileData);
@@ -17,9 +17,9 @@ export default function RunsPage() {
 
   const fetchRuns = async () => {
     try {
-      const data = await runsApi.getAll(100, 0);
+      const data = await runsApi.getAll(100);
       setRuns(data.runs);
-      setTotal(data.total);
+      setTotal(data.total ?? data.runs.length);
       setError(null);
     } catch (err) {
       setError(err instanceof ApiError ? err.message : 'Failed to load runs');
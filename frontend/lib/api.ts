@@ -60,8 +60,12 @@ export const profileApi = {
 
 // Runs API
 export const runsApi = {
-  getAll: (limit = 50, offset = 0) =>
-    fetchApi<RunsListResponse>(`/api/runs?limit=${limit}&offset=${offset}`),
+  getAll: (limit = 50, before?: string, beforeId?: number) =>
+    fetchApi<RunsListResponse>(
+      `/api/runs?limit=${limit}${before ? `&before=${encodeURIComponent(before)}` : ''}${
+        beforeId !== undefined ? `&before_id=${beforeId}` : ''
+      }`
+    ),
   sync: () =>
     fetchApi<SyncResponse>('/api/runs/sync', { method: 'POST' }),
 };
@@ -113,7 +117,9 @@ export interface Run {
 
 export interface RunsListResponse {
   runs: Run[];
-  total: number;
+  total: number | null;
+  next_before: string | null;
+  next_before_id: number | null;
 }
 
 export interface SyncResponse {